@@ -4,6 +4,8 @@ from typing import Optional
 
 from managers.MySQLDBManager import MySQLDBManager
 from managers.PiHoleDBManager import PiHoleDBManager
+from managers.StateManager import StateManager
+from managers.VerificationManager import VerificationManager
 from models.ConfigData import ConfigData
 from models.exceptions import AbortedException
 
@@ -18,13 +20,27 @@ try:
 
     config_data = ConfigData()
 
-    mysql_manager = MySQLDBManager(config_data)
-    mysql_manager.initialize()
+    if config_data.is_verifying:
+        mysql_manager = MySQLDBManager(config_data)
+        pihole_manager = PiHoleDBManager(config_data, mysql_manager.load_queue)
 
-    pihole_manager = PiHoleDBManager(config_data, mysql_manager.load_queue, mysql_manager.last_query_timestamp)
-    pihole_manager.initialize()
+        verification_manager = VerificationManager(config_data, mysql_manager, pihole_manager)
+        verification_manager.verify()
 
-    loop.run_forever()
+    else:
+        state_manager = StateManager(config_data)
+        state_manager.load()
+
+        mysql_manager = MySQLDBManager(config_data, state_manager)
+        mysql_manager.initialize()
+
+        pihole_manager = PiHoleDBManager(config_data,
+                                         mysql_manager.load_queue,
+                                         mysql_manager.last_query_id,
+                                         state_manager)
+        pihole_manager.initialize()
+
+        loop.run_forever()
 
 except AbortedException:
     _LOGGER.debug("Migration aborted")
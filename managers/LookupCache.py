@@ -0,0 +1,133 @@
+import logging
+
+from datetime import datetime
+
+from managers import get_total_seconds
+from models.const import *
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LookupCache:
+    table: str
+    column: str
+
+    def __init__(self, table: str, column: str):
+        self.table = table
+        self.column = column
+
+        self._items = {}
+        self._last_id = -1
+
+        # Items added since the last call to get_changes / get_state
+        self._changes = {}
+
+    @property
+    def is_changed(self):
+        return len(self._changes) > 0
+
+    def get(self, cursor, key):
+        if key not in self._items:
+            self.load(cursor)
+
+            if key not in self._items:
+                _LOGGER.warning(f"{self.column} #{key} not found in {self.table}")
+
+                self._items[key] = None
+                self._changes[key] = None
+
+        return self._items.get(key)
+
+    def load(self, cursor):
+        started = datetime.now()
+
+        query_cmd = PIHOLE_LOOKUP_QUERY
+        query_cmd = query_cmd.replace(PLACEHOLDER_COLUMN, self.column)
+        query_cmd = query_cmd.replace(PLACEHOLDER_TABLE, self.table)
+        query_cmd = query_cmd.replace(PLACEHOLDER_QUERY_ID, str(self._last_id))
+
+        items = cursor.execute(query_cmd).fetchall()
+
+        for item in items:
+            item_id = item[0]
+
+            self._items[item_id] = item[1]
+            self._changes[item_id] = item[1]
+            self._last_id = max(self._last_id, item_id)
+
+        completed = get_total_seconds(started)
+
+        _LOGGER.debug(
+            f"{len(items):,.0f} items loaded from {self.table}, "
+            f"Total: {len(self._items):,.0f}, Duration: {completed:,.3f}"
+        )
+
+    def get_state(self):
+        state = {
+            "last_id": self._last_id,
+            "items": dict(self._items)
+        }
+
+        self._changes = {}
+
+        return state
+
+    def get_changes(self):
+        changes = {
+            "last_id": self._last_id,
+            "items": self._changes
+        }
+
+        self._changes = {}
+
+        return changes
+
+    def restore(self, cursor, state: dict):
+        last_id = state.get("last_id", -1)
+        items = {int(key): value for key, value in state.get("items", {}).items()}
+
+        is_restored = self._is_valid(cursor, items, last_id)
+
+        if is_restored:
+            self._items = items
+            self._last_id = last_id
+
+            _LOGGER.debug(f"{len(items):,.0f} items of {self.table} restored from state")
+
+        self.load(cursor)
+
+        return is_restored
+
+    def _is_valid(self, cursor, items: dict, last_id: int):
+        # FTL removes unused rows and without AUTOINCREMENT the highest ids can be handed out again,
+        # any removal changes the count of rows up to the last id and a reused id is one of the highest
+        placeholders = {
+            PLACEHOLDER_COLUMN: self.column,
+            PLACEHOLDER_TABLE: self.table,
+            PLACEHOLDER_QUERY_ID: str(last_id),
+            PLACEHOLDER_FROM_ID: str(last_id - PIHOLE_LOOKUP_RESTORE_SAMPLE_SIZE + 1),
+            PLACEHOLDER_TO_ID: str(last_id)
+        }
+
+        count_cmd = PIHOLE_LOOKUP_COUNT_QUERY
+        sample_cmd = PIHOLE_LOOKUP_RANGE_QUERY
+
+        for placeholder in placeholders:
+            count_cmd = count_cmd.replace(placeholder, placeholders.get(placeholder))
+            sample_cmd = sample_cmd.replace(placeholder, placeholders.get(placeholder))
+
+        items_count = len([key for key in items if key <= last_id and items[key] is not None])
+        count = cursor.execute(count_cmd).fetchone()[0]
+
+        if count != items_count:
+            _LOGGER.info(f"{self.table} changed since last run, Rows: {count}, Cached: {items_count}")
+
+            return False
+
+        for item_id, value in cursor.execute(sample_cmd).fetchall():
+            if items.get(item_id) != value:
+                _LOGGER.info(f"{self.table} changed since last run, Id #{item_id} was reused")
+
+                return False
+
+        return True
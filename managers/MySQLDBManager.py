@@ -7,6 +7,7 @@ import mysql.connector
 from datetime import datetime
 
 from managers import get_total_seconds, millify
+from managers.StateManager import StateManager
 from models.ConfigData import ConfigData
 from models.const import *
 from models.exceptions import AbortedException
@@ -19,20 +20,28 @@ _LOGGER = logging.getLogger(__name__)
 
 class MySQLDBManager:
     config_data: ConfigData
-    last_query_timestamp: Optional[int]
+    last_query_id: Optional[int]
     total_queries: Optional[int]
     load_queue: queue.Queue
 
-    def __init__(self, config_data: ConfigData):
+    def __init__(self, config_data: ConfigData, state_manager: Optional[StateManager] = None):
         self.load_queue = queue.Queue()
         self.total_queries = None
-        self.last_query_timestamp = None
+        self.last_query_id = None
         self.config_data = config_data
 
-        self._insert_command = self._get_insert_command()
+        self._state_manager = state_manager
+
+        self._insert_fields = [MYSQL_QUERIES_FIELDS_MAPPING[key].get("name") for key in MYSQL_QUERIES_FIELDS_MAPPING]
+        self._prepared_rows = MYSQL_PREPARED_MAX_PLACEHOLDERS // len(self._insert_fields)
+
+        insert_rows = self._prepared_rows if self.config_data.mysql_prepared else 1
+        self._insert_command = self._get_insert_command(insert_rows)
 
         self._connection = None
         self._cursor = None
+        self._prepared_cursor = None
+        self._prepared_tail_cursor = None
 
         self._running = False
 
@@ -41,8 +50,13 @@ class MySQLDBManager:
     def initialize(self):
         self._running = True
 
-        self._connect()
-        self._update_initial_statistics()
+        self.connect()
+
+        if not self.is_connected:
+            raise AbortedException()
+
+        if not self._restore_state():
+            self._update_initial_statistics()
 
         self._timer_load = Timer(1.0, self._load_data_thread)
         self._timer_load.start()
@@ -56,7 +70,11 @@ class MySQLDBManager:
 
         self.load_queue.put({})
 
-    def _connect(self):
+    @property
+    def is_connected(self):
+        return self._connection is not None
+
+    def connect(self):
         try:
             _LOGGER.debug("Connecting to MySQL")
 
@@ -70,12 +88,74 @@ class MySQLDBManager:
                 database=self.config_data.mysql_database)
 
             self._cursor = self._connection.cursor()
+
+            if self.config_data.mysql_prepared:
+                self._prepared_cursor = self._connection.cursor(prepared=True)
+                self._prepared_tail_cursor = self._connection.cursor(prepared=True)
         except Exception as ex:
+            self._connection = None
+            self._cursor = None
+            self._prepared_cursor = None
+            self._prepared_tail_cursor = None
+
             exc_type, exc_obj, exc_tb = sys.exc_info()
             line = exc_tb.tb_lineno
 
             _LOGGER.error(f"Failed to connect to databases, Error: {ex}, Line: {line}")
 
+    def get_max_id(self):
+        max_id = None
+
+        cursor = self._connection.cursor()
+
+        select_max_id_command = SQL_MIGRATION_TABLE_MAX_ID
+        select_max_id_command = select_max_id_command.replace(PLACEHOLDER_TABLE, self.config_data.mysql_table)
+
+        cursor.execute(select_max_id_command)
+
+        for item in cursor:
+            if item is not None and item[0] is not None:
+                max_id = item[0]
+
+        return max_id
+
+    def get_checksums(self, from_id: int, to_id: int):
+        checksums = {}
+
+        cursor = self._connection.cursor()
+
+        select_checksum_command = self._get_range_command(SQL_MIGRATION_TABLE_CHECKSUM, from_id, to_id)
+
+        cursor.execute(select_checksum_command)
+
+        for item in cursor:
+            if item is not None and item[0] is not None:
+                checksums[int(item[0])] = (int(item[1]), int(item[2]))
+
+        return checksums
+
+    def replace_range(self, from_id: int, to_id: int, items):
+        delete_command = self._get_range_command(SQL_COMMAND_DELETE_RANGE, from_id, to_id)
+
+        try:
+            self._cursor.execute(delete_command)
+
+            if items is not None and len(items) > 0:
+                self._insert_items(items)
+
+            self._connection.commit()
+
+        except Exception as ex:
+            if self._connection is not None:
+                self._connection.rollback()
+
+            exc_type, exc_obj, exc_tb = sys.exc_info()
+            line = exc_tb.tb_lineno
+
+            _LOGGER.error(f"Failed to replace range {from_id}-{to_id}, Error: {ex}, Line: {line}")
+
+            raise AbortedException()
+
     def _load_data_thread(self):
         if self._running:
             item = self.load_queue.get()
@@ -86,9 +166,10 @@ class MySQLDBManager:
             timing = item.get("timing", {})
 
             if items_count > 0 and self._running:
-                self._load_data(items)
+                timing["loaded"] = self._load_data(items)
 
                 self._update_statistics(count, timing, items_count)
+                self._save_state(count)
 
                 self.load_queue.task_done()
 
@@ -101,7 +182,7 @@ class MySQLDBManager:
 
         try:
             if self._running and count > 0:
-                self._cursor.executemany(self._insert_command, items)
+                self._insert_items(items)
 
                 self._connection.commit()
 
@@ -120,17 +201,37 @@ class MySQLDBManager:
 
         return completed
 
+    def _insert_items(self, items):
+        if self.config_data.mysql_prepared:
+            # Binary protocol, values are sent as native types in the order of the insert columns.
+            # Full slices reuse the statement prepared on the first batch, the remainder is prepared
+            # on a second cursor so it doesn't replace it
+            for index in range(0, len(items), self._prepared_rows):
+                rows = items[index:index + self._prepared_rows]
+                values = [item.get(name) for item in rows for name in self._insert_fields]
+
+                if len(rows) == self._prepared_rows:
+                    self._prepared_cursor.execute(self._insert_command, values)
+
+                else:
+                    insert_command = self._get_insert_command(len(rows))
+
+                    self._prepared_tail_cursor.execute(insert_command, values)
+
+        else:
+            self._cursor.executemany(self._insert_command, items)
+
     def _update_statistics_from_db(self):
         cursor = self._connection.cursor()
 
-        select_last_query_command = SQL_MIGRATION_TABLE_MAX_QUERY_ID
+        select_last_query_command = SQL_MIGRATION_TABLE_MAX_ID
         select_last_query_command = select_last_query_command.replace(PLACEHOLDER_TABLE, self.config_data.mysql_table)
 
         cursor.execute(select_last_query_command)
 
         for item in cursor:
             if item is not None and item[0] is not None:
-                self.last_query_timestamp = item[0].timestamp()
+                self.last_query_id = item[0]
 
         select_count_command = SQL_MIGRATION_TABLE_COUNT
         select_count_command = select_count_command.replace(PLACEHOLDER_TABLE, self.config_data.mysql_table)
@@ -140,6 +241,48 @@ class MySQLDBManager:
             if item is not None and item[0] is not None:
                 self.total_queries = item[0]
 
+    def _restore_state(self):
+        if self._state_manager is None:
+            return False
+
+        started = datetime.now()
+
+        last_query_id = self._state_manager.get(STATE_LAST_QUERY_ID)
+        total_queries = self._state_manager.get(STATE_TOTAL_QUERIES)
+
+        if last_query_id is None or total_queries is None:
+            return False
+
+        # Batches are committed before the state is saved, the last committed query must match the state
+        max_id = self.get_max_id()
+
+        if max_id != last_query_id:
+            _LOGGER.info(f"State is out of sync, Last query: {last_query_id}, Database: {max_id}")
+
+            return False
+
+        self.last_query_id = last_query_id
+        self.total_queries = total_queries
+
+        completed = get_total_seconds(started)
+
+        _LOGGER.info(
+            f"Database contains {millify(self.total_queries, 3)} queries (restored from state), "
+            f"Duration: stats={completed:.3f}"
+        )
+
+        return True
+
+    def _save_state(self, count: int):
+        if self._state_manager is None:
+            return
+
+        self._state_manager.set(STATE_LAST_QUERY_ID, self.last_query_id)
+        self._state_manager.set(STATE_TOTAL_QUERIES, self.total_queries)
+        self._state_manager.set(STATE_PIHOLE_TOTAL_QUERIES, count)
+
+        self._state_manager.save()
+
     def _update_initial_statistics(self):
         if self._running:
             started = datetime.now()
@@ -206,19 +349,27 @@ class MySQLDBManager:
                 f"Duration: {timing_str}"
             )
 
-    def _get_insert_command(self):
-        fields = []
-        values = []
-        for key in MYSQL_QUERIES_FIELDS_MAPPING:
-            item = MYSQL_QUERIES_FIELDS_MAPPING[key]
+    def _get_range_command(self, command: str, from_id: int, to_id: int):
+        placeholders = {
+            PLACEHOLDER_TABLE: self.config_data.mysql_table,
+            PLACEHOLDER_FROM_ID: str(from_id),
+            PLACEHOLDER_TO_ID: str(to_id)
+        }
 
-            name = item.get("name")
+        for placeholder in placeholders:
+            command = command.replace(placeholder, placeholders.get(placeholder))
+
+        return command
+
+    def _get_insert_command(self, rows: int = 1):
+        values = []
+        for name in self._insert_fields:
+            value = "%s" if self.config_data.mysql_prepared else f"%({name})s"
 
-            fields.append(name)
-            values.append(f"%({name})s")
+            values.append(value)
 
-        columns_str = ", ".join(fields)
-        values_str = ", ".join(values)
+        columns_str = ", ".join(self._insert_fields)
+        values_str = "), (".join([", ".join(values)] * rows)
 
         placeholders = {
             INSERT_COLUMNS: columns_str,
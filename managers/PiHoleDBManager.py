@@ -3,14 +3,16 @@ import queue
 import sqlite3
 import sys
 
-from . import get_total_seconds, to_date, millify
+from . import get_checksum, get_total_seconds, to_date, to_datetime, millify
+from .LookupCache import LookupCache
+from .StateManager import StateManager
 
 from datetime import datetime
 
 from models.ConfigData import ConfigData
 from models.const import *
 
-from threading import Timer
+from threading import Lock, Timer
 from typing import Optional
 
 _LOGGER = logging.getLogger(__name__)
@@ -19,24 +21,43 @@ _LOGGER = logging.getLogger(__name__)
 class PiHoleDBManager:
     load_queue: queue.Queue
     config_data: ConfigData
-    last_query_timestamp: int
+    last_query_id: int
     total_queries: Optional[int]
 
-    def __init__(self, config_data: ConfigData, load_queue: queue.Queue, query_timestamp: Optional[int] = 0):
+    def __init__(self,
+                 config_data: ConfigData,
+                 load_queue: queue.Queue,
+                 query_id: Optional[int] = 0,
+                 state_manager: Optional[StateManager] = None):
         self.load_queue = load_queue
         self.total_queries = None
-        self.last_query_timestamp = 0 if query_timestamp is None else query_timestamp
+        self.last_query_id = 0 if query_id is None else query_id
         self.config_data = config_data
 
+        self._state_manager = state_manager
+
         self._timer_update_counter: Optional[Timer] = None
         self._enrich_load_data: Optional[Timer] = None
 
         self._running = False
 
+        self._is_normalized: Optional[bool] = None
+        self._lookup_caches: dict = {}
+        self._schema_lock = Lock()
+
     def initialize(self):
         self._running = True
 
-        self._timer_update_counter = Timer(1.0, self._update_counter_thread)
+        counter_interval = 1.0
+
+        if self._state_manager is not None:
+            self.total_queries = self._state_manager.get(STATE_PIHOLE_TOTAL_QUERIES)
+
+            # Counting the whole PiHole DB is postponed to the next cycle when the last count is known
+            if self.total_queries is not None:
+                counter_interval = self.config_data.pihole_counter_cycle_interval
+
+        self._timer_update_counter = Timer(counter_interval, self._update_counter_thread)
         self._timer_update_counter.start()
 
         self._enrich_load_data = Timer(1.0, self._enrich_data_thread)
@@ -53,7 +74,74 @@ class PiHoleDBManager:
             self._enrich_load_data.cancel()
             self._enrich_load_data = None
 
-    def _get_db_cursor(self):
+    def get_id_range(self, cursor):
+        min_id = None
+        max_id = None
+
+        query_cmd = PIHOLE_STORAGE_ID_RANGE_QUERY if self._detect_schema(cursor) else PIHOLE_ID_RANGE_QUERY
+
+        data = cursor.execute(query_cmd).fetchall()
+
+        for item in data:
+            if item is not None:
+                min_id = item[0]
+                max_id = item[1]
+
+        return min_id, max_id
+
+    def get_checksums(self, cursor, from_id: int, to_id: int):
+        checksums = {}
+        dates = {}
+        timestamp_key_id = QUERIES_FIELDS.index("timestamp")
+
+        placeholders = {
+            PLACEHOLDER_FROM_ID: str(from_id),
+            PLACEHOLDER_TO_ID: str(to_id)
+        }
+
+        queries = self._get_queries(cursor, PIHOLE_VERIFY_QUERY, PIHOLE_STORAGE_VERIFY_QUERY, placeholders, False)
+
+        for query in queries:
+            values = list(query)
+
+            # Consecutive queries share the same second, formatting is done once per timestamp
+            timestamp = values[timestamp_key_id]
+            date = dates.get(timestamp)
+
+            if date is None:
+                date = to_date(timestamp)
+                dates[timestamp] = date
+
+            values[timestamp_key_id] = date
+
+            bucket = values[0] // VERIFY_BUCKET_SIZE
+            count, checksum = checksums.get(bucket, (0, 0))
+
+            checksums[bucket] = (count + 1, checksum + get_checksum(values))
+
+        return checksums
+
+    def load_range(self, cursor, from_id: int, to_id: int):
+        data_items = []
+
+        placeholders = {
+            PLACEHOLDER_FROM_ID: str(from_id),
+            PLACEHOLDER_TO_ID: str(to_id)
+        }
+
+        queries = self._get_queries(cursor, PIHOLE_LOAD_RANGE_QUERY, PIHOLE_STORAGE_LOAD_RANGE_QUERY, placeholders)
+
+        for query in queries:
+            data = self._transform_query(query)
+
+            if data is None:
+                return None
+
+            data_items.append(data)
+
+        return data_items
+
+    def get_db_cursor(self):
         cursor = None
 
         try:
@@ -69,8 +157,140 @@ class PiHoleDBManager:
 
         return cursor
 
+    def _detect_schema(self, cursor):
+        # Counter and enrich threads start together, caches are published only once fully loaded
+        with self._schema_lock:
+            if self._is_normalized is None:
+                tables = [item[0] for item in cursor.execute(PIHOLE_TABLES_QUERY).fetchall()]
+
+                is_normalized = PIHOLE_STORAGE_TABLE in tables
+                lookup_caches = {}
+                is_lookups_reset = False
+
+                if is_normalized:
+                    for field in PIHOLE_STORAGE_LOOKUP_TABLES:
+                        lookup = PIHOLE_STORAGE_LOOKUP_TABLES.get(field)
+                        table = lookup.get("table")
+
+                        if table in tables:
+                            lookup_cache = LookupCache(table, lookup.get("column"))
+                            lookup_state = self._get_lookup_state(table)
+
+                            is_restored = lookup_state is not None and lookup_cache.restore(cursor, lookup_state)
+
+                            if lookup_state is None:
+                                lookup_cache.load(cursor)
+
+                            if lookup.get("persist"):
+                                is_lookups_reset = is_lookups_reset or not is_restored
+
+                            lookup_caches[QUERIES_FIELDS.index(field)] = lookup_cache
+
+                    if is_lookups_reset and self._state_manager is not None:
+                        lookups = {}
+
+                        for field in PIHOLE_STORAGE_LOOKUP_TABLES:
+                            lookup = PIHOLE_STORAGE_LOOKUP_TABLES.get(field)
+                            lookup_cache = lookup_caches.get(QUERIES_FIELDS.index(field))
+
+                            if lookup_cache is not None and lookup.get("persist"):
+                                lookups[lookup_cache.table] = lookup_cache.get_state()
+
+                        self._state_manager.save_lookups(lookups)
+
+                # Restored caches hold their own copy, the parsed lookups file is no longer needed
+                if self._state_manager is not None:
+                    self._state_manager.clear_lookups()
+
+                self._lookup_caches = lookup_caches
+                self._is_normalized = is_normalized
+
+                schema = "normalized" if self._is_normalized else "legacy"
+
+                _LOGGER.info(f"PiHole DB schema: {schema}")
+
+        return self._is_normalized
+
+    def _get_queries(self, cursor, query_cmd: str, storage_query_cmd: str, placeholders: dict,
+                     with_network_addresses: bool = True):
+        is_normalized = self._detect_schema(cursor)
+
+        if is_normalized:
+            query_cmd = storage_query_cmd
+
+        for placeholder in placeholders:
+            query_cmd = query_cmd.replace(placeholder, placeholders.get(placeholder))
+
+        _LOGGER.debug(f"PiHole query: {query_cmd}")
+
+        queries = cursor.execute(query_cmd).fetchall()
+
+        if is_normalized:
+            queries = self._resolve_queries(cursor, queries, with_network_addresses)
+
+        return queries
+
+    def _resolve_queries(self, cursor, queries: list, with_network_addresses: bool):
+        network_addresses = {}
+        empty_network_address = (None,) * len(NETWORK_ADDRESSES_FIELDS)
+        client_key_id = QUERIES_FIELDS.index("client")
+
+        if with_network_addresses and len(queries) > 0:
+            ip_key_id = NETWORK_ADDRESSES_FIELDS.index("ip")
+
+            for network_address in cursor.execute(PIHOLE_NETWORK_ADDRESSES_QUERY).fetchall():
+                network_addresses[network_address[ip_key_id]] = network_address
+
+        resolved_queries = []
+
+        for query in queries:
+            resolved_query = list(query)
+
+            # Same as the queries view, only integer values are references to the lookup tables
+            for key_id in self._lookup_caches:
+                value = resolved_query[key_id]
+
+                if isinstance(value, int):
+                    resolved_query[key_id] = self._lookup_caches[key_id].get(cursor, value)
+
+            if with_network_addresses:
+                client = resolved_query[client_key_id]
+
+                resolved_query.extend(network_addresses.get(client, empty_network_address))
+
+            resolved_queries.append(resolved_query)
+
+        self._update_lookup_state()
+
+        return resolved_queries
+
+    def _get_lookup_state(self, table: str):
+        lookup_state = None
+
+        if self._state_manager is not None:
+            lookup_state = self._state_manager.get_lookup(table)
+
+        return lookup_state
+
+    def _update_lookup_state(self):
+        lookups = {}
+
+        for field in PIHOLE_STORAGE_LOOKUP_TABLES:
+            lookup = PIHOLE_STORAGE_LOOKUP_TABLES.get(field)
+            lookup_cache = self._lookup_caches.get(QUERIES_FIELDS.index(field))
+
+            if lookup_cache is not None and lookup_cache.is_changed:
+                changes = lookup_cache.get_changes()
+
+                if lookup.get("persist"):
+                    lookups[lookup_cache.table] = changes
+
+        # Only ids added since the last batch are appended, the file is rewritten when a cache was reloaded
+        if self._state_manager is not None and len(lookups) > 0:
+            self._state_manager.append_lookups(lookups)
+
     def _update_counter_thread(self):
-        cursor = self._get_db_cursor()
+        cursor = self.get_db_cursor()
         is_connected = cursor is not None
 
         if is_connected and self._running:
@@ -82,7 +302,7 @@ class PiHoleDBManager:
             self._timer_update_counter.start()
 
     def _enrich_data_thread(self):
-        cursor = self._get_db_cursor()
+        cursor = self.get_db_cursor()
         is_connected = cursor is not None
 
         if is_connected and self._running:
@@ -101,13 +321,12 @@ class PiHoleDBManager:
         started = datetime.now()
 
         try:
-            query_cmd = PIHOLE_LOAD_QUERY
-            query_cmd = query_cmd.replace(PLACEHOLDER_QUERY_ID, str(self.last_query_timestamp))
-            query_cmd = query_cmd.replace(PLACEHOLDER_LIMIT, str(self.config_data.pihole_enrich_batch_size))
-
-            _LOGGER.debug(f"Enrich query: {query_cmd}")
+            placeholders = {
+                PLACEHOLDER_QUERY_ID: str(self.last_query_id),
+                PLACEHOLDER_LIMIT: str(self.config_data.pihole_enrich_batch_size)
+            }
 
-            queries = cursor.execute(query_cmd).fetchall()
+            queries = self._get_queries(cursor, PIHOLE_LOAD_QUERY, PIHOLE_STORAGE_LOAD_QUERY, placeholders)
         except Exception as ex:
             exc_type, exc_obj, exc_tb = sys.exc_info()
             line = exc_tb.tb_lineno
@@ -149,17 +368,17 @@ class PiHoleDBManager:
 
         if len(data_items) == len(queries):
             last_item = data_items[len(data_items) - 1]
-            last_query_timestamp = last_item.get("query_id")
+            last_query_id = last_item.get("query_id")
 
             migration_data = {
                 "count": self.total_queries,
                 "items": data_items,
-                "from": self.last_query_timestamp,
-                "to": last_query_timestamp,
+                "from": self.last_query_id,
+                "to": last_query_id,
                 "timing": timing
             }
 
-            self.last_query_timestamp = last_query_timestamp
+            self.last_query_id = last_query_id
 
             self.load_queue.put(migration_data)
 
@@ -169,9 +388,9 @@ class PiHoleDBManager:
                 f"Duration: {completed:,.3f}"
             )
 
-    @staticmethod
-    def _transform_query(query):
+    def _transform_query(self, query):
         data = None
+        is_prepared = self.config_data.mysql_prepared
 
         try:
             data = {}
@@ -187,7 +406,7 @@ class PiHoleDBManager:
                     data_item = query_item
 
                     if key_type == "timestamp":
-                        data_item = to_date(query_item)
+                        data_item = to_datetime(query_item) if is_prepared else to_date(query_item)
 
                     elif key_type == "int":
                         data_item = int(query_item)
@@ -208,7 +427,9 @@ class PiHoleDBManager:
         _LOGGER.debug("Loading PiHole metadata from SQLite")
         started = datetime.now()
 
-        data = cursor.execute("SELECT COUNT(id) from queries").fetchall()
+        query_cmd = PIHOLE_STORAGE_COUNT_QUERY if self._detect_schema(cursor) else PIHOLE_COUNT_QUERY
+
+        data = cursor.execute(query_cmd).fetchall()
 
         for item in data:
             if item is not None and item[0] is not None:
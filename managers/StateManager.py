@@ -0,0 +1,236 @@
+import json
+import logging
+import os
+import sys
+
+from threading import Lock
+from typing import Optional, Any
+
+from models.ConfigData import ConfigData
+from models.const import *
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class StateManager:
+    config_data: ConfigData
+
+    def __init__(self, config_data: ConfigData):
+        self.config_data = config_data
+
+        self._state = {}
+        self._lock = Lock()
+
+        self._lookups = {}
+        self._lookups_lock = Lock()
+
+    @property
+    def is_enabled(self):
+        path = self.config_data.state_file_path
+
+        return path is not None and len(path) > 0
+
+    @property
+    def lookups_file_path(self):
+        path, extension = os.path.splitext(self.config_data.state_file_path)
+
+        return f"{path}.lookups{extension}"
+
+    def load(self):
+        if not self.is_enabled:
+            return
+
+        self._load_state()
+        self._load_lookups()
+
+    def _load_state(self):
+        if not os.path.isfile(self.config_data.state_file_path):
+            return
+
+        try:
+            with open(self.config_data.state_file_path) as f:
+                content = f.read()
+
+                state = json.loads(content)
+
+            header = {
+                STATE_VERSION: state.get(STATE_VERSION),
+                STATE_IDENTITY: state.get(STATE_IDENTITY)
+            }
+
+            if header != self._get_header():
+                _LOGGER.info("State file belongs to another configuration, ignored")
+
+            else:
+                self._state = state
+
+                _LOGGER.debug(f"State loaded, Last query: {self.get(STATE_LAST_QUERY_ID)}")
+
+        except Exception as ex:
+            exc_type, exc_obj, exc_tb = sys.exc_info()
+            line = exc_tb.tb_lineno
+
+            _LOGGER.error(f"Failed to load state, Error: {ex}, Line: {line}")
+
+    def _load_lookups(self):
+        if not os.path.isfile(self.lookups_file_path):
+            return
+
+        try:
+            with open(self.lookups_file_path, "rb+") as f:
+                header = json.loads(f.readline())
+
+                if header != self._get_header():
+                    _LOGGER.info("Lookups file belongs to another configuration, ignored")
+
+                    return
+
+                position = f.tell()
+
+                for line in iter(f.readline, b""):
+                    try:
+                        changes = json.loads(line)
+
+                    except ValueError:
+                        # Incomplete line of an interrupted append, removed so next appends start on a new line
+                        f.truncate(position)
+                        break
+
+                    position = f.tell()
+
+                    table = changes.get(STATE_LOOKUP_TABLE)
+                    lookup = self._lookups.get(table, {"last_id": -1, "items": {}})
+
+                    lookup["last_id"] = max(lookup["last_id"], changes.get("last_id"))
+                    lookup["items"].update(changes.get("items"))
+
+                    self._lookups[table] = lookup
+
+            _LOGGER.debug(f"Lookups loaded, Tables: {list(self._lookups.keys())}")
+
+        except Exception as ex:
+            exc_type, exc_obj, exc_tb = sys.exc_info()
+            line = exc_tb.tb_lineno
+
+            self._lookups = {}
+
+            _LOGGER.error(f"Failed to load lookups, Error: {ex}, Line: {line}")
+
+    def get_lookup(self, table: str):
+        return self._lookups.get(table)
+
+    def clear_lookups(self):
+        self._lookups = {}
+
+    def save_lookups(self, lookups: dict):
+        if not self.is_enabled:
+            return
+
+        path = self.lookups_file_path
+        temp_path = f"{path}.tmp"
+
+        try:
+            with self._lookups_lock:
+                with open(temp_path, "w") as f:
+                    f.write(self._get_lookups_content(self._get_header(), lookups))
+                    f.flush()
+
+                    os.fsync(f.fileno())
+
+                os.replace(temp_path, path)
+
+        except Exception as ex:
+            exc_type, exc_obj, exc_tb = sys.exc_info()
+            line = exc_tb.tb_lineno
+
+            _LOGGER.error(f"Failed to save lookups, Error: {ex}, Line: {line}")
+
+    def append_lookups(self, lookups: dict):
+        if not self.is_enabled:
+            return
+
+        if not os.path.isfile(self.lookups_file_path):
+            self.save_lookups(lookups)
+
+            return
+
+        try:
+            with self._lookups_lock:
+                with open(self.lookups_file_path, "a") as f:
+                    f.write(self._get_lookups_content(None, lookups))
+                    f.flush()
+
+                    os.fsync(f.fileno())
+
+        except Exception as ex:
+            exc_type, exc_obj, exc_tb = sys.exc_info()
+            line = exc_tb.tb_lineno
+
+            _LOGGER.error(f"Failed to append lookups, Error: {ex}, Line: {line}")
+
+    @staticmethod
+    def _get_lookups_content(header: Optional[dict], lookups: dict):
+        lines = [] if header is None else [header]
+
+        for table in lookups:
+            changes = dict(lookups.get(table))
+            changes[STATE_LOOKUP_TABLE] = table
+
+            lines.append(changes)
+
+        content = "".join([f"{json.dumps(line, separators=(',', ':'))}\n" for line in lines])
+
+        return content
+
+    def get(self, key: str, default: Optional[Any] = None):
+        with self._lock:
+            return self._state.get(key, default)
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._state[key] = value
+
+    def save(self):
+        if not self.is_enabled:
+            return
+
+        path = self.config_data.state_file_path
+        temp_path = f"{path}.tmp"
+
+        try:
+            with self._lock:
+                self._state.update(self._get_header())
+
+                content = json.dumps(self._state, separators=(",", ":"))
+
+            with open(temp_path, "w") as f:
+                f.write(content)
+                f.flush()
+
+                os.fsync(f.fileno())
+
+            os.replace(temp_path, path)
+
+        except Exception as ex:
+            exc_type, exc_obj, exc_tb = sys.exc_info()
+            line = exc_tb.tb_lineno
+
+            _LOGGER.error(f"Failed to save state, Error: {ex}, Line: {line}")
+
+    def _get_header(self):
+        header = {
+            STATE_VERSION: STATE_FILE_VERSION,
+            STATE_IDENTITY: self._get_identity()
+        }
+
+        return header
+
+    def _get_identity(self):
+        config_data = self.config_data
+
+        identity = (
+            f"{config_data.pihole_db_path}|"
+            f"{config_data.mysql_host}/{config_data.mysql_database}/{config_data.mysql_table}"
+        )
+
+        return identity
@@ -0,0 +1,157 @@
+import logging
+
+from datetime import datetime
+
+from managers import get_total_seconds, millify
+from managers.MySQLDBManager import MySQLDBManager
+from managers.PiHoleDBManager import PiHoleDBManager
+from models.ConfigData import ConfigData
+from models.const import *
+from models.exceptions import AbortedException
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class VerificationManager:
+    config_data: ConfigData
+    mysql_manager: MySQLDBManager
+    pihole_manager: PiHoleDBManager
+
+    def __init__(self, config_data: ConfigData, mysql_manager: MySQLDBManager, pihole_manager: PiHoleDBManager):
+        self.config_data = config_data
+        self.mysql_manager = mysql_manager
+        self.pihole_manager = pihole_manager
+
+        self._cursor = None
+
+    def verify(self):
+        started = datetime.now()
+
+        self.mysql_manager.connect()
+        self._cursor = self.pihole_manager.get_db_cursor()
+
+        if not self.mysql_manager.is_connected or self._cursor is None:
+            raise AbortedException()
+
+        from_id, to_id = self._get_id_range()
+
+        if from_id is None or to_id is None:
+            _LOGGER.info("Nothing to verify")
+
+            return
+
+        _LOGGER.info(f"Verifying queries {from_id}-{to_id}")
+
+        chunk_size = self.config_data.verify_chunk_size
+        verified = 0
+        ranges = []
+
+        for chunk_from_id in range(from_id, to_id + 1, chunk_size):
+            chunk_to_id = min(chunk_from_id + chunk_size - 1, to_id)
+
+            chunk_ranges, count = self._verify_chunk(chunk_from_id, chunk_to_id)
+
+            ranges.extend(chunk_ranges)
+            verified += count
+
+            _LOGGER.debug(f"Chunk {chunk_from_id}-{chunk_to_id} verified, Mismatches: {len(chunk_ranges)}")
+
+        ranges = self._merge_ranges(ranges, chunk_size)
+
+        repaired = 0
+        for range_from_id, range_to_id in ranges:
+            repaired += self._repair_range(range_from_id, range_to_id)
+
+        completed = get_total_seconds(started)
+
+        _LOGGER.info(
+            f"{millify(verified, 3)} queries verified, "
+            f"{len(ranges)} ranges with {millify(repaired, 3)} queries re-migrated, "
+            f"Duration: {completed:,.3f}"
+        )
+
+    def _get_id_range(self):
+        from_id, source_to_id = self.pihole_manager.get_id_range(self._cursor)
+        destination_to_id = self.mysql_manager.get_max_id()
+
+        if source_to_id is None or destination_to_id is None:
+            return None, None
+
+        # Queries that were not migrated yet are left to the migration process
+        to_id = min(source_to_id, destination_to_id)
+
+        return from_id, to_id
+
+    def _verify_chunk(self, from_id: int, to_id: int):
+        # Both sides are summed per bucket of ids in a single pass, mismatched buckets are the ranges to repair
+        source_checksums = self.pihole_manager.get_checksums(self._cursor, from_id, to_id)
+        destination_checksums = self.mysql_manager.get_checksums(from_id, to_id)
+
+        ranges = []
+        count = 0
+
+        for bucket in sorted(set(source_checksums) | set(destination_checksums)):
+            source_checksum = source_checksums.get(bucket)
+            destination_checksum = destination_checksums.get(bucket)
+
+            if source_checksum is not None:
+                count += source_checksum[0]
+
+            if source_checksum != destination_checksum:
+                bucket_from_id = max(from_id, bucket * VERIFY_BUCKET_SIZE)
+                bucket_to_id = min(to_id, (bucket + 1) * VERIFY_BUCKET_SIZE - 1)
+
+                _LOGGER.debug(
+                    f"Range {bucket_from_id}-{bucket_to_id} mismatch, "
+                    f"Source: {source_checksum}, "
+                    f"Destination: {destination_checksum}"
+                )
+
+                ranges.append((bucket_from_id, bucket_to_id))
+
+        return ranges, count
+
+    def _repair_range(self, from_id: int, to_id: int):
+        started = datetime.now()
+        repaired = 0
+
+        # Each slice is loaded and replaced in its own transaction, same size as a migration batch
+        batch_size = self.config_data.pihole_enrich_batch_size
+
+        for slice_from_id in range(from_id, to_id + 1, batch_size):
+            slice_to_id = min(slice_from_id + batch_size - 1, to_id)
+
+            items = self.pihole_manager.load_range(self._cursor, slice_from_id, slice_to_id)
+
+            if items is None:
+                _LOGGER.error(f"Failed to transform queries {slice_from_id}-{slice_to_id}")
+
+                raise AbortedException()
+
+            self.mysql_manager.replace_range(slice_from_id, slice_to_id, items)
+
+            repaired += len(items)
+
+        completed = get_total_seconds(started)
+
+        _LOGGER.info(
+            f"{millify(repaired, 3)} queries re-migrated for range {from_id}-{to_id}, "
+            f"Duration: {completed:,.3f}"
+        )
+
+        return repaired
+
+    @staticmethod
+    def _merge_ranges(ranges: list, max_size: int):
+        merged = []
+
+        for from_id, to_id in ranges:
+            is_adjacent = len(merged) > 0 and merged[-1][1] + 1 == from_id
+
+            if is_adjacent and to_id - merged[-1][0] < max_size:
+                merged[-1] = (merged[-1][0], to_id)
+
+            else:
+                merged.append((from_id, to_id))
+
+        return merged
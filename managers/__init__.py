@@ -1,13 +1,42 @@
 import math
+import zlib
 from datetime import datetime
 from decimal import Decimal
 
+from models.const import VERIFY_SEPARATOR
+
+
+def to_seconds(timestamp):
+    """Round to whole seconds (half up), DATETIME columns are written without fraction."""
+    if timestamp is None:
+        return None
+
+    return int(math.floor(timestamp + 0.5))
+
+
+def to_datetime(timestamp):
+    if timestamp is None:
+        return None
+
+    return datetime.fromtimestamp(to_seconds(timestamp))
+
 
 def to_date(timestamp):
     if timestamp is None:
         return None
 
-    return datetime.fromtimestamp(timestamp).isoformat()
+    return to_datetime(timestamp).isoformat()
+
+
+def get_checksum(values):
+    """Row checksum, equivalent to CRC32(CONCAT_WS(...)) in MySQL."""
+    content = VERIFY_SEPARATOR.join([
+        value.decode("utf-8", "surrogateescape") if isinstance(value, bytes) else str(value)
+        for value in values
+        if value is not None
+    ])
+
+    return zlib.crc32(content.encode("utf-8", "surrogateescape"))
 
 
 def get_total_seconds(started):
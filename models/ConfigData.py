@@ -15,8 +15,12 @@ class ConfigData:
     pihole_enrich_batch_size: int
     pihole_enrich_cycle_interval: float
     pihole_counter_cycle_interval: float
+    state_file_path: str
+    mysql_prepared: bool
     is_debug: bool
     is_back_filling: bool
+    is_verifying: bool
+    verify_chunk_size: int
 
     def __init__(self):
         self._config = self._get_config_data()
@@ -27,15 +31,25 @@ class ConfigData:
         self.mysql_database = self.get_config_item("MYSQL_DATABASE")
         self.mysql_table = self.get_config_item("MYSQL_TABLE")
         self.pihole_db_path = self.get_config_item("PIHOLE_DB_PATH")
+        self.state_file_path = self.get_config_item("STATE_FILE_PATH", "./state.json")
+
+        prepared = self.get_config_item("MYSQL_PREPARED", False)
+
+        self.mysql_prepared = str(prepared).lower() == str(True).lower()
 
         debug = self.get_config_item("DEBUG", False)
 
         self.is_debug = str(debug).lower() == str(True).lower()
         self.is_back_filling = True
 
+        verify = self.get_config_item("VERIFY", False)
+
+        self.is_verifying = str(verify).lower() == str(True).lower()
+
         self.pihole_enrich_batch_size = int(self.get_config_item("PIHOLE_ENRICH_BATCH_SIZE", 75000))
         self.pihole_enrich_cycle_interval = float(self.get_config_item("PIHOLE_ENRICH_CYCLE_INTERVAL", 60))
         self.pihole_counter_cycle_interval = float(self.get_config_item("PIHOLE_COUNTER_CYCLE_INTERVAL", 60))
+        self.verify_chunk_size = int(self.get_config_item("VERIFY_CHUNK_SIZE", 100000))
 
         log_level = logging.INFO
 
@@ -76,10 +90,14 @@ class ConfigData:
             "mysql_host": self.mysql_host,
             "mysql_database": self.mysql_database,
             "mysql_table": self.mysql_table,
+            "mysql_prepared": self.mysql_prepared,
             "pihole_db_path": self.pihole_db_path,
+            "state_file_path": self.state_file_path,
             "pihole_enrich_batch_size": self.pihole_enrich_batch_size,
             "pihole_enrich_cycle_interval": self.pihole_enrich_cycle_interval,
-            "pihole_counter_cycle_interval": self.pihole_counter_cycle_interval
+            "pihole_counter_cycle_interval": self.pihole_counter_cycle_interval,
+            "verify": self.is_verifying,
+            "verify_chunk_size": self.verify_chunk_size
         }
 
         to_string = f"{data}"
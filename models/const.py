@@ -1,9 +1,20 @@
 PLACEHOLDER_QUERY_ID = "[QUERY_ID]"
 PLACEHOLDER_LIMIT = "[MIGRATION_LIMIT]"
 PLACEHOLDER_TABLE = "[TABLE]"
+PLACEHOLDER_FROM_ID = "[FROM_ID]"
+PLACEHOLDER_TO_ID = "[TO_ID]"
+PLACEHOLDER_COLUMN = "[COLUMN]"
 INSERT_COLUMNS = "[COLUMNS]"
 INSERT_VALUES = "[VALUES]"
 
+STATE_FILE_VERSION = 1
+STATE_VERSION = "version"
+STATE_IDENTITY = "identity"
+STATE_LAST_QUERY_ID = "last_query_id"
+STATE_TOTAL_QUERIES = "total_queries"
+STATE_PIHOLE_TOTAL_QUERIES = "pihole_total_queries"
+STATE_LOOKUP_TABLE = "table"
+
 
 QUERIES_FIELDS = [
     "id",  # INTEGER
@@ -82,6 +93,19 @@ DATA_COLUMNS_QUERY = f"{QUERIES_FIELDS_STR}, {NETWORK_ADDRESSES_FIELDS_STR}"
 DATA_COLUMNS_RESULT = DATA_COLUMNS_QUERY.replace("na.", "").replace("q.", "")
 DATA_COLUMNS_RESULT_ARR = DATA_COLUMNS_RESULT.split(", ")
 
+# Client columns are a snapshot of network_addresses at migration time,
+# verification covers only the columns originated in the queries table
+VERIFY_FIELDS = [MYSQL_QUERIES_FIELDS_MAPPING[key_id] for key_id in range(len(QUERIES_FIELDS))]
+VERIFY_SEPARATOR = "#"
+VERIFY_DATE_FORMAT = "%Y-%m-%dT%H:%i:%s"
+VERIFY_BUCKET_SIZE = 1000
+
+VERIFY_COLUMNS_CHECKSUM = ", ".join([
+    f"DATE_FORMAT({field.get('name')}, '{VERIFY_DATE_FORMAT}')" if field.get("type") == "timestamp"
+    else field.get("name")
+    for field in VERIFY_FIELDS
+])
+
 PIHOLE_LOAD_QUERY = (
     f"SELECT {DATA_COLUMNS_QUERY} "
     "FROM queries as q "
@@ -89,11 +113,120 @@ PIHOLE_LOAD_QUERY = (
     "   ON "
     "       na.ip = q.client "
     "WHERE "
-    f"   q.timestamp > {PLACEHOLDER_QUERY_ID} "
+    f"   q.id > {PLACEHOLDER_QUERY_ID} "
     "ORDER BY q.id "
     f"LIMIT {PLACEHOLDER_LIMIT};"
 )
 
+PIHOLE_LOAD_RANGE_QUERY = (
+    f"SELECT {DATA_COLUMNS_QUERY} "
+    "FROM queries as q "
+    "LEFT JOIN network_addresses as na "
+    "   ON "
+    "       na.ip = q.client "
+    "WHERE "
+    f"   q.id BETWEEN {PLACEHOLDER_FROM_ID} AND {PLACEHOLDER_TO_ID} "
+    "ORDER BY q.id;"
+)
+
+PIHOLE_VERIFY_QUERY = (
+    f"SELECT {QUERIES_FIELDS_STR} "
+    "FROM queries as q "
+    "WHERE "
+    f"   q.id BETWEEN {PLACEHOLDER_FROM_ID} AND {PLACEHOLDER_TO_ID};"
+)
+
+PIHOLE_ID_RANGE_QUERY = "SELECT MIN(id), MAX(id) FROM queries;"
+
+PIHOLE_COUNT_QUERY = "SELECT COUNT(id) FROM queries;"
+
+# Normalized schema (FTL v6), the queries view resolves the columns below using the lookup tables
+PIHOLE_STORAGE_TABLE = "query_storage"
+
+PIHOLE_STORAGE_LOOKUP_TABLES = {
+    "domain": {
+        "table": "domain_by_id",
+        "column": "domain",
+        "persist": True
+    },
+    "client": {
+        "table": "client_by_id",
+        "column": "ip",
+        "persist": True
+    },
+    "forward": {
+        "table": "forward_by_id",
+        "column": "forward",
+        "persist": True
+    },
+    "additional_info": {
+        "table": "addinfo_by_id",
+        "column": "content",
+        "persist": False
+    }
+}
+
+PIHOLE_TABLES_QUERY = "SELECT name FROM sqlite_master WHERE type = 'table';"
+
+PIHOLE_LOOKUP_QUERY = (
+    f"SELECT id, {PLACEHOLDER_COLUMN} "
+    f"FROM {PLACEHOLDER_TABLE} "
+    "WHERE "
+    f"   id > {PLACEHOLDER_QUERY_ID};"
+)
+
+PIHOLE_LOOKUP_RESTORE_SAMPLE_SIZE = 100
+
+PIHOLE_LOOKUP_RANGE_QUERY = (
+    f"SELECT id, {PLACEHOLDER_COLUMN} "
+    f"FROM {PLACEHOLDER_TABLE} "
+    "WHERE "
+    f"   id BETWEEN {PLACEHOLDER_FROM_ID} AND {PLACEHOLDER_TO_ID};"
+)
+
+PIHOLE_LOOKUP_COUNT_QUERY = (
+    "SELECT COUNT(id) "
+    f"FROM {PLACEHOLDER_TABLE} "
+    "WHERE "
+    f"   id <= {PLACEHOLDER_QUERY_ID};"
+)
+
+PIHOLE_NETWORK_ADDRESSES_QUERY = (
+    f"SELECT {NETWORK_ADDRESSES_FIELDS_STR} "
+    "FROM network_addresses as na;"
+)
+
+PIHOLE_STORAGE_LOAD_QUERY = (
+    f"SELECT {QUERIES_FIELDS_STR} "
+    f"FROM {PIHOLE_STORAGE_TABLE} as q "
+    "WHERE "
+    f"   q.id > {PLACEHOLDER_QUERY_ID} "
+    "ORDER BY q.id "
+    f"LIMIT {PLACEHOLDER_LIMIT};"
+)
+
+PIHOLE_STORAGE_LOAD_RANGE_QUERY = (
+    f"SELECT {QUERIES_FIELDS_STR} "
+    f"FROM {PIHOLE_STORAGE_TABLE} as q "
+    "WHERE "
+    f"   q.id BETWEEN {PLACEHOLDER_FROM_ID} AND {PLACEHOLDER_TO_ID} "
+    "ORDER BY q.id;"
+)
+
+PIHOLE_STORAGE_VERIFY_QUERY = (
+    f"SELECT {QUERIES_FIELDS_STR} "
+    f"FROM {PIHOLE_STORAGE_TABLE} as q "
+    "WHERE "
+    f"   q.id BETWEEN {PLACEHOLDER_FROM_ID} AND {PLACEHOLDER_TO_ID};"
+)
+
+PIHOLE_STORAGE_ID_RANGE_QUERY = f"SELECT MIN(id), MAX(id) FROM {PIHOLE_STORAGE_TABLE};"
+
+PIHOLE_STORAGE_COUNT_QUERY = f"SELECT COUNT(id) FROM {PIHOLE_STORAGE_TABLE};"
+
+# Placeholders limit of a single prepared statement
+MYSQL_PREPARED_MAX_PLACEHOLDERS = 65535
+
 SQL_COMMAND_MIGRATE = (
     f"INSERT INTO {PLACEHOLDER_TABLE} "
     f"  ({INSERT_COLUMNS}) "
@@ -108,7 +241,22 @@ SQL_MIGRATION_TABLE_COUNT = (
     f"  table_name = '{PLACEHOLDER_TABLE}';"
 )
 
-SQL_MIGRATION_TABLE_MAX_QUERY_ID = (
-    f"SELECT MAX(query_timestamp) "
+SQL_MIGRATION_TABLE_MAX_ID = (
+    f"SELECT MAX(query_id) "
     f"FROM {PLACEHOLDER_TABLE};"
 )
+
+SQL_MIGRATION_TABLE_CHECKSUM = (
+    f"SELECT query_id DIV {VERIFY_BUCKET_SIZE}, COUNT(*), "
+    f"  SUM(CRC32(CONCAT_WS('{VERIFY_SEPARATOR}', {VERIFY_COLUMNS_CHECKSUM}))) "
+    f"FROM {PLACEHOLDER_TABLE} "
+    f"WHERE "
+    f"  query_id BETWEEN {PLACEHOLDER_FROM_ID} AND {PLACEHOLDER_TO_ID} "
+    f"GROUP BY 1;"
+)
+
+SQL_COMMAND_DELETE_RANGE = (
+    f"DELETE FROM {PLACEHOLDER_TABLE} "
+    f"WHERE "
+    f"  query_id BETWEEN {PLACEHOLDER_FROM_ID} AND {PLACEHOLDER_TO_ID};"
+)